@@ -1,49 +1,92 @@
 import streamlit as st
-import cadquery as cq
-import trimesh
-import plotly.graph_objects as go
+import numpy as np
 from io import BytesIO
 
-# Function to generate the quadcopter frame
+# Heavy libraries are imported on first use rather than at the top of the
+# script, so a cold start only pays for what the current run needs
+@st.cache_resource
+def _cq():
+    import cadquery
+    return cadquery
+
+@st.cache_resource
+def _trimesh():
+    import trimesh
+    return trimesh
+
+@st.cache_resource
+def _go():
+    import plotly.graph_objects
+    return plotly.graph_objects
+
+# Function to generate the quadcopter frame, quantized to the 1 mm slider
+# step so near-identical parameter sets share one cached build
 def create_quadcopter_frame(arm_length, arm_width, body_size, motor_mount_diameter):
-    # Base body of the quadcopter
-    body = cq.Workplane("XY").box(body_size, body_size, 20)
-
-    # Generate arms
-    for i in range(4):
-        arm = (cq.Workplane("XY")
-               .box(arm_length, arm_width, 10)
-               .translate((body_size / 2 + arm_length / 2, 0, 5)))
+    return _build_frame(int(round(arm_length)), int(round(arm_width)),
+                        int(round(body_size)), int(round(motor_mount_diameter)))
 
-        # Rotate and position each arm
-        arm = arm.rotate((0, 0, 0), (0, 0, 1), i * 90)
-        body = body.union(arm)
+@st.cache_resource(max_entries=256)
+def _build_frame(arm_length, arm_width, body_size, motor_mount_diameter):
+    cq = _cq()
 
-    # Create motor mounts
-    for i in range(4):
-        mount = (cq.Workplane("XY")
-                 .circle(motor_mount_diameter / 2)
-                 .extrude(5)
-                 .translate((body_size / 2 + arm_length - motor_mount_diameter, 0, 15)))
-
-        mount = mount.rotate((0, 0, 0), (0, 0, 1), i * 90)
-        body = body.union(mount)
+    # Base body of the quadcopter
+    body = cq.Solid.makeBox(body_size, body_size, 20,
+                            cq.Vector(-body_size / 2, -body_size / 2, -10))
+
+    # Build one arm and one motor mount, then place copies at four
+    # rotational positions around the body
+    arm = cq.Solid.makeBox(arm_length, arm_width, 10,
+                           cq.Vector(-arm_length / 2, -arm_width / 2, 0))
+    arm_locations = (cq.Workplane("XY")
+                     .polarArray(body_size / 2 + arm_length / 2, 0, 360, 4)
+                     .vals())
+    arm_shapes = [arm.moved(loc) for loc in arm_locations]
+
+    mount = cq.Solid.makeCylinder(motor_mount_diameter / 2, 5, cq.Vector(0, 0, 15))
+    mount_locations = (cq.Workplane("XY")
+                       .polarArray(body_size / 2 + arm_length - motor_mount_diameter, 0, 360, 4)
+                       .vals())
+    mount_shapes = [mount.moved(loc) for loc in mount_locations]
+
+    # Fuse all parts onto the body in a single boolean operation
+    body = body.fuse(*arm_shapes, *mount_shapes, glue=False).clean()
 
     return body
 
-# Function to convert STL to Plotly mesh
-def plotly_mesh(stl_path):
-    mesh = trimesh.load_mesh(stl_path)
+# Function to export the frame as binary STL bytes in memory
+@st.cache_data(max_entries=64)
+def export_stl(params):
+    trimesh = _trimesh()
+    frame = create_quadcopter_frame(*params)
+    vertices, triangles = frame.tessellate(0.05, 0.3)
+    mesh = trimesh.Trimesh(vertices=[v.toTuple() for v in vertices], faces=triangles)
+    return mesh.export(file_type="stl")
+
+# Function to parse STL bytes into per-axis vertex coordinates and per-corner
+# face indices for the preview
+@st.cache_data(max_entries=64)
+def load_mesh_arrays(stl_bytes):
+    trimesh = _trimesh()
+    mesh = trimesh.load_mesh(BytesIO(stl_bytes), file_type="stl")
+
     vertices = mesh.vertices
     faces = mesh.faces
-
-    x, y, z = vertices.T
-    i, j, k = faces.T
+    return dict(
+        x=np.ascontiguousarray(vertices[:, 0], dtype=np.float32),
+        y=np.ascontiguousarray(vertices[:, 1], dtype=np.float32),
+        z=np.ascontiguousarray(vertices[:, 2], dtype=np.float32),
+        i=np.ascontiguousarray(faces[:, 0], dtype=np.int32),
+        j=np.ascontiguousarray(faces[:, 1], dtype=np.int32),
+        k=np.ascontiguousarray(faces[:, 2], dtype=np.int32),
+    )
+
+# Function to convert the mesh arrays to a Plotly mesh
+def plotly_mesh(mesh_soa):
+    go = _go()
 
     fig = go.Figure(data=[
         go.Mesh3d(
-            x=x, y=y, z=z,
-            i=i, j=j, k=k,
+            **mesh_soa,
             color='lightblue',
             opacity=0.50
         )
@@ -58,37 +101,55 @@ def plotly_mesh(stl_path):
 
     return fig
 
+# Parameter form, model generation and preview, rerun on their own so a
+# submission doesn't rebuild the rest of the page
+@st.fragment
+def model_section():
+    # UI for parameters, batched in a form so the model is only rebuilt when
+    # the user submits
+    with st.sidebar.form("params"):
+        arm_length = st.slider('Arm Length (mm)', 50, 200, 100, step=1)
+        arm_width = st.slider('Arm Width (mm)', 5, 20, 10, step=1)
+        body_size = st.slider('Body Size (mm)', 40, 100, 60, step=1)
+        motor_mount_diameter = st.slider('Motor Mount Diameter (mm)', 5, 20, 10, step=1)
+        submitted = st.form_submit_button("Update")
+
+    # Generate model and export it as STL whenever the parameter fingerprint
+    # changes; resubmitting identical parameters reuses stored outputs
+    if submitted or 'last_key' not in st.session_state:
+        params = (arm_length, arm_width, body_size, motor_mount_diameter)
+        key = hash(params)
+        if st.session_state.get('last_key') != key:
+            with st.spinner("Computing STL…"):
+                st.session_state['stl_bytes'] = export_stl(params)
+            st.session_state['last_key'] = key
+
+    stl_bytes = st.session_state['stl_bytes']
+
+    # Keep the preview arrays for the current STL in session state so reruns
+    # hand them straight to Plotly
+    if st.session_state.get('mesh_key') != st.session_state['last_key']:
+        st.session_state['mesh_soa'] = load_mesh_arrays(stl_bytes)
+        st.session_state['mesh_key'] = st.session_state['last_key']
+
+    fig = plotly_mesh(st.session_state['mesh_soa'])
+    st.plotly_chart(fig, width="stretch")
+
+    # Provide a download button for the STL file
+    st.sidebar.download_button(
+        label="Download STL",
+        data=stl_bytes,
+        file_name="quadcopter_frame.stl",
+        mime="application/octet-stream"
+    )
+
 def main():
     st.title('Parametric Quadcopter Frame Generator')
-
-    # UI for parameters
     st.sidebar.header("Quadcopter Parameters")
-    arm_length = st.sidebar.slider('Arm Length (mm)', 50, 200, 100, step=1)
-    arm_width = st.sidebar.slider('Arm Width (mm)', 5, 20, 10, step=1)
-    body_size = st.sidebar.slider('Body Size (mm)', 40, 100, 60, step=1)
-    motor_mount_diameter = st.sidebar.slider('Motor Mount Diameter (mm)', 5, 20, 10, step=1)
-
-    # Generate model
-    frame = create_quadcopter_frame(arm_length, arm_width, body_size, motor_mount_diameter)
-
-    # Export model as STL
-    stl_path = "/tmp/quadcopter_frame.stl"
-    frame_val = frame.val()
-    frame_val.exportStl(stl_path)
 
     # Display the 3D model using Plotly
     st.header("3D Model Preview")
-    fig = plotly_mesh(stl_path)
-    st.plotly_chart(fig, use_container_width=True)
-
-    # Provide a download button for the STL file
-    with open(stl_path, "rb") as f:
-        st.sidebar.download_button(
-            label="Download STL",
-            data=f,
-            file_name="quadcopter_frame.stl",
-            mime="application/octet-stream"
-        )
+    model_section()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file